@@ -12,36 +12,87 @@ Usage:
     python qa_runner.py [target_directory]
     python qa_runner.py .
     python qa_runner.py /path/to/tofu/project
+    python qa_runner.py . --since origin/main
+
+With --since (or GITHUB_BASE_REF set in a pull request workflow), TFLint,
+Trivy and Checkov only scan the .tf files changed relative to that ref.
+Format and validate always cover the whole configuration. On a full scan,
+Trivy and Checkov run once per top-level module directory in parallel; module
+calls that cross those directories are not evaluated in the caller's context.
+
+Passing results are cached in <target>/.qa_cache, keyed by command, tool
+version and the contents of every OpenTofu source, test, variable, lock and
+scanner config file, including local modules outside the target; unchanged
+projects are not rescanned. Validate is never cached, since it depends on
+the state left by tofu init. Pass --no-cache to force a fresh run. Check
+output too large to keep in memory is written to <target>/.qa_cache/*.out
+and previewed in the report.
 
 Requirements:
     - tofu (OpenTofu CLI)
     - tflint
     - trivy
     - checkov
+    - orjson (optional; faster parsing of large scanner JSON)
 
 For post-deploy cloud posture assessment, use prowler separately:
     prowler gcp --project-id my-project
 """
 
+from __future__ import annotations
+
 import subprocess
-import json
+import io
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
-from datetime import datetime
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, List, Set, Tuple, Optional, Union
+from dataclasses import dataclass, asdict
+
+# Modules only some code paths need are imported where they are used, so
+# the CLI starts quickly when it just reports missing tools
+if TYPE_CHECKING:
+    from datetime import datetime
+
+# Read size when draining subprocess pipes
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Selectors only accept pipes on POSIX; on Windows each pipe gets a reader thread
+SELECT_PIPES = os.name != "nt"
+
+# orjson module once probed, or False if it is not installed
+_ORJSON: Any = None
 
 
 @dataclass
 class CheckResult:
     """Result of a single QA check."""
+    # Hand-written rather than dataclass(slots=True), which needs Python 3.10
+    __slots__ = (
+        "name", "passed", "output", "errors", "return_code", "duration_seconds",
+        "output_size", "output_paths"
+    )
+
     name: str
     passed: bool
-    output: str
+    output: str  # Full stdout, or only a preview when output_paths is non-empty
     errors: str
     return_code: int
     duration_seconds: float
+    output_size: int  # Bytes of stdout produced
+    output_paths: List[str]  # Files holding stdout too large to keep in memory
+
+    def to_dict(self) -> Dict:
+        """Serialize for the on-disk result cache."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CheckResult":
+        """Deserialize a result written by to_dict."""
+        return cls(**data)
 
 
 class QARunner:
@@ -88,6 +139,19 @@ class QARunner:
         ),
     ]
 
+    # Fix-up advice for each failing check, shown under Recommendations
+    RECOMMENDATIONS: Dict[str, str] = {
+        "Format": "Run `tofu fmt -recursive` to fix formatting",
+        "Validate": "Fix configuration errors before proceeding",
+        "TFLint": "Review and fix linting issues",
+        "Trivy": "Address security misconfigurations (AVD-GCP-* checks)",
+        "Checkov": "Fix policy violations (CKV_GCP_* checks)",
+    }
+
+    # Checks whose stdout is only reported on failure. They run with stdout
+    # discarded and are rerun with it captured only if they fail.
+    QUIET_CHECKS = {"Format", "Validate"}
+
     # Required tools and their version commands
     REQUIRED_TOOLS: Dict[str, List[str]] = {
         "tofu": ["tofu", "--version"],
@@ -96,36 +160,90 @@ class QARunner:
         "checkov": ["checkov", "--version"],
     }
 
-    def __init__(self, target: str = "."):
+    # Directory (relative to target) holding cached check results
+    CACHE_DIR = ".qa_cache"
+
+    # Checks that are always rerun; Validate depends on the tofu init state
+    UNCACHED_CHECKS = {"Validate"}
+
+    # Files whose contents are part of every cache key: configuration,
+    # tests (checked by tofu fmt), variables, the provider lock and scanner
+    # settings
+    CACHE_INPUT_SUFFIXES = (
+        ".tf", ".tf.json", ".tofu", ".tfvars", ".tfvars.json", ".tftest.hcl", ".tofutest.hcl"
+    )
+    CACHE_INPUT_NAMES = {
+        ".tflint.hcl", ".trivyignore", ".checkov.yml", ".checkov.yaml", ".terraform.lock.hcl"
+    }
+
+    # Check output beyond this many bytes is written to a file in CACHE_DIR,
+    # keeping only the first OUTPUT_PREVIEW_SIZE bytes in memory
+    OUTPUT_MEMORY_LIMIT = 1_000_000
+    OUTPUT_PREVIEW_SIZE = 8192
+
+    # Most check processes alive at once. Sharding can start a Checkov and
+    # a Trivy process per module directory, each using hundreds of MB.
+    MAX_PARALLEL = 8
+
+    # Tool version strings, probed at most once per process
+    _tool_versions: Dict[str, str] = {}
+
+    # Resolved executable paths, looked up at most once per process
+    _executables: Dict[str, str] = {}
+
+    def __init__(
+        self,
+        target: str = ".",
+        changed_files: Optional[List[Path]] = None,
+        use_cache: bool = True
+    ):
         """Initialize QA Runner.
 
         Args:
             target: Directory to run checks against (default: current directory)
+            changed_files: Optional list of changed files; when set, scanners
+                only run against the changed .tf files and their directories
+            use_cache: Reuse results of earlier runs when no input changed
         """
         self.target = Path(target).resolve()
-        self.results: Dict[str, CheckResult] = {}
+        self.use_cache = use_cache
+        self._cache_dir = self.target / self.CACHE_DIR
+        self._tf_digest: Optional[str] = None
+        self._tf_files: Optional[Tuple[Path, ...]] = None
+        self._input_files: Optional[Tuple[Path, ...]] = None
+        self._used_cache_files: Set[str] = set()
+        self._tool_status: Optional[Dict[str, bool]] = None
+        self.changed_files: Optional[List[Path]] = None
+        if changed_files is not None:
+            self.changed_files = sorted({
+                path for path in ((self.target / f).resolve() for f in changed_files)
+                if path.suffix == ".tf" and path.is_file() and self.target in path.parents
+            })
+        self.results: List[CheckResult] = []  # In declared CHECKS order
+        self.skipped: Dict[str, str] = {}  # Check name -> reason it did not run
+        self._result_idx: Dict[str, int] = {}
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
+        self.duration_seconds: Optional[float] = None
 
     def check_prerequisites(self) -> Dict[str, bool]:
         """Verify required tools are installed.
 
+        The version probes are independent subprocesses and run
+        concurrently. The outcome is kept for the life of the runner, and
+        the version strings are reused as cache keys by run_all.
+
         Returns:
             Dictionary mapping tool name to availability status
         """
-        tool_status = {}
-        for tool, version_cmd in self.REQUIRED_TOOLS.items():
-            try:
-                subprocess.run(
-                    version_cmd,
-                    capture_output=True,
-                    check=True,
-                    timeout=10
-                )
-                tool_status[tool] = True
-            except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
-                tool_status[tool] = False
-        return tool_status
+        if self._tool_status is None:
+            with ThreadPoolExecutor(max_workers=len(self.REQUIRED_TOOLS)) as executor:
+                versions = executor.map(self._tool_version, self.REQUIRED_TOOLS)
+                self._tool_status = {
+                    tool: version is not None
+                    for tool, version in zip(self.REQUIRED_TOOLS, versions)
+                }
+        return dict(self._tool_status)
 
     def get_missing_tools(self) -> List[str]:
         """Get list of missing required tools.
@@ -162,26 +280,461 @@ class QARunner:
                 return False
         return True
 
-    def run_all(self) -> Dict[str, CheckResult]:
+    def run_all(self) -> List[CheckResult]:
         """Run all QA checks.
 
+        Checks are independent subprocesses, so they run concurrently.
+        Each result is written to its check's slot in the declared CHECKS
+        order as it completes, keeping reports deterministic.
+
         Returns:
-            Dictionary mapping check name to CheckResult
+            List of CheckResult in CHECKS order
         """
+        from datetime import datetime
+
         self.start_time = datetime.now()
+        start = time.perf_counter()
 
         # Ensure tofu is initialized for validate to work
         self.run_init_if_needed()
 
-        for name, cmd, output_type, description in self.CHECKS:
-            print(f"Running {name}... ", end="", flush=True)
-            self.results[name] = self._run_check(name, cmd, output_type, description)
-            status = "PASS" if self.results[name].passed else "FAIL"
-            print(status)
+        # Walk the tree once; sharding and cache keys share the snapshot
+        self._tf_files = None
+        self._input_files = None
+        self._used_cache_files = set()
+        checks = self._build_checks()
+
+        # Hash inputs and probe versions once up front rather than per command
+        self._tf_digest = None
+        if self.use_cache:
+            self._tf_digest = self._hash_inputs()
+            for tool in {cmd[0] for _, cmd, _, _ in checks}:
+                self._tool_version(tool)
+        parts: Dict[str, List[Optional[CheckResult]]] = {
+            name: [] for name, _, _, _ in self.CHECKS if name not in self.skipped
+        }
+        slots: List[Tuple[str, int]] = []
+        for name, _, _, _ in checks:
+            slots.append((name, len(parts.setdefault(name, []))))
+            parts[name].append(None)
+        pending = {name: len(results) for name, results in parts.items()}
+        order = [name for name, _, _, _ in self.CHECKS if name in self.skipped or name in parts]
+        self._result_idx = {name: i for i, name in enumerate(order)}
+        results: List[Optional[CheckResult]] = [None] * len(order)
+        progress: List[str] = []
+
+        # Skipped checks still get a (passing) result, so reports keep every check
+        for name, reason in self.skipped.items():
+            results[self._result_idx[name]] = CheckResult(
+                name=name,
+                passed=True,
+                output=f"Skipped: {reason}",
+                errors="",
+                return_code=0,
+                duration_seconds=0.0,
+                output_size=0,
+                output_paths=[]
+            )
+            progress.append(f"Running {name}... SKIPPED\n")
+
+        def finish(index: int, result: CheckResult) -> None:
+            name, slot = slots[index]
+            parts[name][slot] = result
+            pending[name] -= 1
+            if pending[name] == 0:
+                merged = self._merge_results(name, parts[name])
+                results[self._result_idx[name]] = merged
+                status = "PASS" if merged.passed else "FAIL"
+                progress.append(f"Running {name}... {status}\n")
+
+        def flush_progress() -> None:
+            # One write and flush per batch of completed checks
+            if progress:
+                sys.stdout.write("".join(progress))
+                sys.stdout.flush()
+                progress.clear()
+
+        misses = []
+        cache_paths = []
+        for index, (name, cmd, _, _) in enumerate(checks):
+            cache_path = self._cache_path(name, cmd)
+            cached = self._load_cached(cache_path)
+            if cached is not None:
+                finish(index, cached)
+            else:
+                misses.append(index)
+                cache_paths.append(cache_path)
+        flush_progress()
+
+        workers = max(len(self.CHECKS), min(_cpu_count(), self.MAX_PARALLEL))
+        commands = [(checks[i][0], checks[i][1]) for i in misses]
+        for i, result in self._run_many(commands, max_parallel=workers):
+            self._store_cached(cache_paths[i], result)
+            finish(misses[i], result)
+            flush_progress()
 
+        self.results = results
+        self._prune_cache()
+
+        self.duration_seconds = time.perf_counter() - start
         self.end_time = datetime.now()
         return self.results
 
+    def get_result(self, name: str) -> Optional[CheckResult]:
+        """Look up the result of a check from the last run.
+
+        Args:
+            name: Check name
+
+        Returns:
+            CheckResult, or None if the check did not run
+        """
+        i = self._result_idx.get(name)
+        return self.results[i] if i is not None else None
+
+    def _build_checks(self) -> List[Tuple[str, List[str], str, str]]:
+        """Build the check commands for this run.
+
+        With changed files, format and validate stay global, while the
+        scanners are restricted to the changed files (Checkov) or their
+        directories (TFLint, Trivy; only the outermost ones for Trivy,
+        which scans recursively). Otherwise Checkov and Trivy are
+        sharded across top-level module directories so they use more than
+        one core; projects with a single module run CHECKS unchanged. A
+        check may appear more than once; run_all merges its results.
+
+        Returns:
+            List of (name, command, output_type, description) tuples
+        """
+        self.skipped = {}
+        if self.changed_files is None:
+            return self._build_sharded_checks()
+
+        files = [str(f.relative_to(self.target)) for f in self.changed_files]
+        dirs = sorted({str(f.parent.relative_to(self.target)) for f in self.changed_files})
+
+        checks = []
+        for name, cmd, output_type, description in self.CHECKS:
+            if name in ("Format", "Validate"):
+                checks.append((name, cmd, output_type, description))
+            elif not files:
+                self.skipped[name] = "no changed .tf files"
+            elif name == "TFLint":
+                for d in dirs:
+                    checks.append((name, [cmd[0], f"--chdir={d}", *cmd[1:]], output_type, description))
+            elif name == "Trivy":
+                # Trivy scans recursively; a directory nested in another
+                # selected one would be scanned, and reported, twice
+                for d in dirs:
+                    if not any(str(parent) in dirs for parent in Path(d).parents):
+                        checks.append((name, [d if arg == "." else arg for arg in cmd], output_type, description))
+            elif name == "Checkov":
+                scan_args = [arg for f in files for arg in ("-f", f)]
+                i = cmd.index("-d")
+                checks.append((name, cmd[:i] + scan_args + cmd[i + 2:], output_type, description))
+            else:
+                checks.append((name, cmd, output_type, description))
+        return checks
+
+    def _build_sharded_checks(self) -> List[Tuple[str, List[str], str, str]]:
+        """Split the whole-project Checkov and Trivy scans by module.
+
+        Each top-level directory containing .tf files becomes one shard.
+        The rest of the target forms another, scanning the target as a
+        directory while skipping the shard directories (Checkov
+        --skip-path, Trivy --skip-dirs). Checkov only needs it when there
+        are .tf files directly in the target; Trivy always gets it, since
+        it also scans Dockerfiles, Kubernetes manifests and .tf.json
+        files wherever they are.
+
+        Each shard is scanned on its own, so module calls that cross a
+        shard boundary (the root calling ./modules/x, or envs/prod calling
+        ../../modules/x) are no longer evaluated with the caller's
+        arguments; findings that depend on those values may differ from
+        an unsharded scan. Run the scanner on the whole target directly
+        when that context matters.
+
+        Returns:
+            List of (name, command, output_type, description) tuples
+        """
+        import re
+
+        root_files, dirs = self._shard_modules()
+        if len(dirs) + bool(root_files) < 2:
+            return list(self.CHECKS)  # Not worth paying scanner startup twice
+
+        checks = []
+        for name, cmd, output_type, description in self.CHECKS:
+            if name == "Checkov":
+                i = cmd.index("-d")
+                if root_files:
+                    # Checkov drops every absolute path a --skip-path value
+                    # matches as an unanchored regex or contains as a
+                    # substring, so a bare "network" would also skip
+                    # network.tf; anchor each value to its shard directory
+                    sep = re.escape(os.sep)
+                    patterns = [f"{re.escape(str(self.target / d))}({sep}|$)" for d in dirs]
+                    skip_args = [arg for p in patterns for arg in ("--skip-path", p)]
+                    checks.append((name, cmd + skip_args, output_type, description))
+                for d in dirs:
+                    checks.append((name, cmd[:i + 1] + [d] + cmd[i + 2:], output_type, description))
+            elif name == "Trivy":
+                skip_args = [arg for d in dirs for arg in ("--skip-dirs", d)]
+                checks.append((name, cmd + skip_args, output_type, description))
+                for d in dirs:
+                    checks.append((name, [d if arg == "." else arg for arg in cmd], output_type, description))
+            else:
+                checks.append((name, cmd, output_type, description))
+        return checks
+
+    def _shard_modules(self) -> Tuple[List[str], List[str]]:
+        """Find the shards for a whole-project scan.
+
+        Returns:
+            Tuple of (.tf files directly in target, top-level directories
+            containing .tf files), both relative to target and sorted
+        """
+        root_files = set()
+        dirs = set()
+        for rel in self._list_tf_files():
+            if len(rel.parts) == 1:
+                root_files.add(str(rel))
+            elif not rel.parts[0].startswith("."):
+                dirs.add(rel.parts[0])
+        return sorted(root_files), sorted(dirs)
+
+    def _merge_results(self, name: str, parts: List[CheckResult]) -> CheckResult:
+        """Combine the results of a check that ran as several commands.
+
+        If any part's output was moved to a file, the merged result lists
+        every part's file and keeps the in-memory outputs and previews;
+        the files themselves are referenced, not copied.
+
+        Args:
+            name: Check name
+            parts: Results of each command, in build order
+
+        Returns:
+            Single CheckResult that passes only if every part passed
+        """
+        if len(parts) == 1:
+            return parts[0]
+
+        output_paths = [path for p in parts for path in p.output_paths]
+        outputs = [p.output for p in parts if p.output.strip()]
+        output = None if output_paths else _merge_json(outputs)
+        if output is None:
+            output = "\n".join(outputs)
+
+        return CheckResult(
+            name=name,
+            passed=all(p.passed for p in parts),
+            output=output,
+            errors="\n".join(p.errors for p in parts if p.errors),
+            return_code=next((p.return_code for p in parts if p.return_code != 0), 0),
+            duration_seconds=max(p.duration_seconds for p in parts),  # parts run concurrently
+            output_size=sum(p.output_size for p in parts),
+            output_paths=output_paths
+        )
+
+    def _tool_version(self, tool: str) -> Optional[str]:
+        """Get a tool's version string, probing it once per process.
+
+        Args:
+            tool: Tool name from REQUIRED_TOOLS
+
+        Returns:
+            Version command output, or None if the tool is unknown or broken
+        """
+        if tool not in self.REQUIRED_TOOLS:
+            return None
+        if tool not in self._tool_versions:
+            try:
+                result = subprocess.run(
+                    self.REQUIRED_TOOLS[tool],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=10
+                )
+            except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+                return None
+            self._tool_versions[tool] = result.stdout.strip()
+        return self._tool_versions[tool]
+
+    def _hash_inputs(self) -> str:
+        """Hash the path and contents of every cache input file under target.
+
+        Besides the OpenTofu sources this covers variable files, the
+        provider lock, scanner configs and the installed module manifest,
+        so changing any of them invalidates cached results. Local modules
+        outside target (source = "../../modules/x") are read by the
+        scanners too, so their input files are hashed as well.
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        import hashlib
+        import re
+
+        source_re = re.compile(rb'\bsource\s*=\s*"(\.\.?/[^"]*)"')
+        digest = hashlib.sha256()
+        pending: List[Path] = []
+
+        def update(name: str, path: Path) -> None:
+            data = path.read_bytes()
+            digest.update(name.encode())
+            digest.update(b"\0")
+            digest.update(data)
+            digest.update(b"\0")
+            if path.suffix == ".tf":
+                pending.extend(path.parent / m.group(1).decode() for m in source_re.finditer(data))
+
+        for rel in self._list_input_files():
+            update(str(rel), self.target / rel)
+
+        # Follow local module sources that leave target, including modules
+        # those modules call; a module is the files directly in its directory
+        seen: Set[Path] = set()
+        while pending:
+            module_dir = pending.pop(0).resolve()
+            if module_dir in seen or module_dir == self.target or self.target in module_dir.parents:
+                continue
+            seen.add(module_dir)
+            try:
+                files = sorted(module_dir.iterdir())
+            except OSError:
+                continue  # Missing module; tofu reports it
+            for path in files:
+                if path.is_file() and (
+                    path.name.endswith(self.CACHE_INPUT_SUFFIXES) or path.name in self.CACHE_INPUT_NAMES
+                ):
+                    update(str(path), path)
+        return digest.hexdigest()
+
+    def _list_tf_files(self) -> Tuple[Path, ...]:
+        """List the .tf files under target, walking the tree at most once per run.
+
+        Returns:
+            Sorted paths relative to target
+        """
+        if self._tf_files is None:
+            self._walk_target()
+        return self._tf_files
+
+    def _list_input_files(self) -> Tuple[Path, ...]:
+        """List the files hashed into cache keys, walking the tree at most once per run.
+
+        Returns:
+            Sorted paths relative to target
+        """
+        if self._input_files is None:
+            self._walk_target()
+        return self._input_files
+
+    def _walk_target(self) -> None:
+        """Snapshot the .tf files and cache input files under target.
+
+        .terraform directories (downloaded modules, managed by tofu init)
+        are pruned rather than walked and filtered out afterwards; only
+        their module manifest is hashed. CACHE_DIR and .git are skipped.
+        """
+        tf_files = []
+        input_files = []
+        for dirpath, dirnames, filenames in os.walk(self.target):
+            rel_dir = Path(dirpath).relative_to(self.target)
+            if ".terraform" in dirnames:
+                dirnames.remove(".terraform")
+                manifest = rel_dir / ".terraform" / "modules" / "modules.json"
+                if (self.target / manifest).is_file():
+                    input_files.append(manifest)
+            for skipped in (self.CACHE_DIR, ".git"):
+                if skipped in dirnames:
+                    dirnames.remove(skipped)
+            for f in filenames:
+                if f.endswith(".tf"):
+                    tf_files.append(rel_dir / f)
+                if f.endswith(self.CACHE_INPUT_SUFFIXES) or f in self.CACHE_INPUT_NAMES:
+                    input_files.append(rel_dir / f)
+        self._tf_files = tuple(sorted(tf_files))
+        self._input_files = tuple(sorted(input_files))
+
+    def _cache_path(self, name: str, cmd: List[str]) -> Optional[Path]:
+        """Get the cache file for a check command, if it can be cached.
+
+        Only checks backed by a REQUIRED_TOOLS binary are cached, and never
+        those in UNCACHED_CHECKS. The key covers the command, tool version
+        and every cache input file, so upgrading a tool or editing any
+        configuration, variable or scanner config file invalidates it.
+
+        Args:
+            name: Check name
+            cmd: Command to execute
+
+        Returns:
+            Path to the cache file, or None if the check is not cacheable
+        """
+        import hashlib
+
+        if not self.use_cache or name in self.UNCACHED_CHECKS:
+            return None
+        version = self._tool_version(cmd[0])
+        if version is None:
+            return None
+        if self._tf_digest is None:
+            self._tf_digest = self._hash_inputs()
+        key = hashlib.sha256(
+            "\0".join([*cmd, version, self._tf_digest]).encode()
+        ).hexdigest()
+        self._used_cache_files.add(f"{name}-{key}.json")
+        return self._cache_dir / f"{name}-{key}.json"
+
+    def _output_path(self, name: str, cmd: List[str]) -> Path:
+        """Get the file that receives a command's stdout if it is too large to keep.
+
+        Cacheable commands share their cache entry's key, so a cached
+        result keeps pointing at the output it was produced with.
+
+        Args:
+            name: Check name
+            cmd: Command to execute
+
+        Returns:
+            Path of the output file in CACHE_DIR
+        """
+        import hashlib
+
+        cache_path = self._cache_path(name, cmd)
+        if cache_path is not None:
+            output_path = cache_path.with_suffix(".out")
+        else:
+            key = hashlib.sha256("\0".join(cmd).encode()).hexdigest()
+            output_path = self._cache_dir / f"{name}-{key}.out"
+        self._used_cache_files.add(output_path.name)
+        return output_path
+
+    def _prune_cache(self) -> None:
+        """Delete files in CACHE_DIR that the last run did not use.
+
+        Cache entries and output files are keyed by their inputs, so every
+        edit leaves the previous ones behind; without pruning the
+        directory would grow with each run. A --no-cache run does not
+        read the cache and leaves its entries alone.
+        """
+        try:
+            entries = list(self._cache_dir.iterdir())
+        except OSError:
+            return  # No cache directory yet
+        for path in entries:
+            if path.name == ".gitignore" or path.name in self._used_cache_files:
+                continue
+            if not self.use_cache and path.suffix == ".json":
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass  # Pruning is best-effort
+
     def _run_check(
         self,
         name: str,
@@ -200,54 +753,223 @@ class QARunner:
         Returns:
             CheckResult with execution details
         """
-        start = datetime.now()
+        cache_path = self._cache_path(name, cmd)
+        cached = self._load_cached(cache_path)
+        if cached is not None:
+            return cached
+
+        _, result = next(self._run_many([(name, cmd)]))
+        self._store_cached(cache_path, result)
+        return result
+
+    @staticmethod
+    def _load_cached(cache_path: Optional[Path]) -> Optional[CheckResult]:
+        """Read a cached check result.
+
+        Args:
+            cache_path: Cache file from _cache_path, or None if not cacheable
+
+        Returns:
+            Cached CheckResult with zero duration, or None on a miss
+        """
+        if cache_path is None or not cache_path.is_file():
+            return None
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                cwd=self.target,
-                timeout=600  # 10 minute timeout
-            )
-            duration = (datetime.now() - start).total_seconds()
-
-            # Parse JSON output if expected
-            output = result.stdout
-            if output_type == "json" and result.stdout.strip():
-                try:
-                    parsed = json.loads(result.stdout)
-                    output = json.dumps(parsed, indent=2)
-                except json.JSONDecodeError:
-                    pass  # Keep raw output if JSON parsing fails
-
-            return CheckResult(
-                name=name,
-                passed=result.returncode == 0,
-                output=output,
-                errors=result.stderr,
-                return_code=result.returncode,
-                duration_seconds=duration
-            )
-        except subprocess.TimeoutExpired:
-            duration = (datetime.now() - start).total_seconds()
-            return CheckResult(
-                name=name,
-                passed=False,
-                output="",
-                errors=f"Check timed out after {duration:.1f} seconds",
-                return_code=-1,
-                duration_seconds=duration
-            )
-        except Exception as e:
-            duration = (datetime.now() - start).total_seconds()
-            return CheckResult(
-                name=name,
-                passed=False,
-                output="",
-                errors=str(e),
-                return_code=-1,
-                duration_seconds=duration
-            )
+            cached = CheckResult.from_dict(_json_loads(cache_path.read_bytes()))
+        except (OSError, ValueError, TypeError):
+            return None  # Unreadable entry; rerun and overwrite it
+        if not all(os.path.isfile(path) for path in cached.output_paths):
+            return None  # Full output was deleted; rerun to recreate it
+        cached.duration_seconds = 0.0
+        return cached
+
+    def _store_cached(self, cache_path: Optional[Path], result: CheckResult) -> None:
+        """Write a passing check result to the cache.
+
+        Failures are not cached: they may come from the environment (a
+        failed init, a missing plugin) rather than from the hashed inputs,
+        and must be rechecked once it is fixed.
+
+        Args:
+            cache_path: Cache file from _cache_path, or None if not cacheable
+            result: Result to store
+        """
+        if cache_path is None or result.return_code != 0:
+            return
+        try:
+            _make_cache_dir(self._cache_dir)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(_json_dumps(result.to_dict()), encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # Caching is best-effort
+
+    def _run_many(
+        self,
+        commands: List[Tuple[str, List[str]]],
+        max_parallel: Optional[int] = None,
+        timeout: float = 600  # 10 minute timeout
+    ) -> Iterator[Tuple[int, CheckResult]]:
+        """Run commands concurrently from a single selector loop.
+
+        One loop drains every process's stdout and stderr and enforces
+        each process's deadline, so no reader or timeout threads are
+        needed. Where pipes cannot be selected on (Windows, see
+        SELECT_PIPES) a reader thread drains each pipe instead and the
+        loop only polls for exits and deadlines. Stdout beyond
+        OUTPUT_MEMORY_LIMIT is streamed to a file in CACHE_DIR and only a
+        preview is kept in memory. QUIET_CHECKS first run with stdout sent
+        to /dev/null.
+
+        Args:
+            commands: (check name, command) pairs to run
+            max_parallel: Maximum number of processes alive at once
+                (default: all of them)
+            timeout: Seconds each process may run before it is killed
+
+        Yields:
+            (index into commands, CheckResult) in completion order
+        """
+        import selectors
+        import threading
+
+        # (index, name, command, discard stdout, start time of first attempt)
+        queue = [
+            (index, name, cmd, name in self.QUIET_CHECKS, None)
+            for index, (name, cmd) in enumerate(commands)
+        ]
+        queue.reverse()  # Pop from the end in submission order
+        running: List[_Running] = []
+        sel = selectors.DefaultSelector()
+        try:
+            while queue or running:
+                while queue and len(running) < (max_parallel or len(commands)):
+                    index, name, cmd, quiet, start = queue.pop()
+                    if start is None:
+                        start = time.perf_counter()
+                    try:
+                        proc = subprocess.Popen(
+                            [self._executable(cmd[0]), *cmd[1:]],
+                            stdout=subprocess.DEVNULL if quiet else subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            cwd=self.target
+                        )
+                    except Exception as e:
+                        yield index, CheckResult(
+                            name=name,
+                            passed=False,
+                            output="",
+                            errors=str(e),
+                            return_code=-1,
+                            duration_seconds=time.perf_counter() - start,
+                            output_size=0,
+                            output_paths=[]
+                        )
+                        continue
+                    run = _Running(
+                        index, name, cmd, proc, start, time.perf_counter() + timeout,
+                        _OutputSink(
+                            self._output_path(name, cmd),
+                            self.OUTPUT_MEMORY_LIMIT,
+                            self.OUTPUT_PREVIEW_SIZE
+                        ),
+                        _OutputSink()
+                    )
+                    for pipe, sink in ((proc.stdout, run.stdout), (proc.stderr, run.stderr)):
+                        if pipe is None:
+                            continue
+                        if SELECT_PIPES:
+                            sel.register(pipe, selectors.EVENT_READ, (run, sink))
+                        else:
+                            reader = threading.Thread(target=_drain_pipe, args=(pipe, sink), daemon=True)
+                            reader.start()
+                            run.readers.append(reader)
+                        run.open_pipes += 1
+                    running.append(run)
+                if not running:
+                    continue
+
+                # Wake for output, the nearest deadline, or (once a process
+                # has closed both pipes) a short poll for its exit
+                now = time.perf_counter()
+                wait = min(run.deadline for run in running) - now
+                if any(run.open_pipes == 0 for run in running):
+                    wait = min(wait, 0.01)
+                if not SELECT_PIPES:
+                    time.sleep(min(max(wait, 0), 0.05))
+                    for run in running:
+                        run.open_pipes = sum(reader.is_alive() for reader in run.readers)
+                for key, _ in sel.select(timeout=max(wait, 0)) if SELECT_PIPES else ():
+                    run, sink = key.data
+                    data = os.read(key.fd, COPY_CHUNK_SIZE)
+                    if data:
+                        sink.write(data)
+                    else:
+                        sel.unregister(key.fileobj)
+                        key.fileobj.close()
+                        run.open_pipes -= 1
+
+                now = time.perf_counter()
+                for run in list(running):
+                    if run.open_pipes == 0 and run.proc.poll() is not None:
+                        running.remove(run)
+                        duration = now - run.start
+                        run.close(sel)
+                        if run.proc.returncode != 0 and run.proc.stdout is None:
+                            # Quiet check failed; rerun to capture its output
+                            queue.append((run.index, run.name, run.cmd, False, run.start))
+                            continue
+                        result = CheckResult(
+                            name=run.name,
+                            passed=run.proc.returncode == 0,
+                            # Keep raw output; JSON is pretty-printed only when a report renders it
+                            output=run.stdout.text(),
+                            errors=run.stderr.text(),
+                            return_code=run.proc.returncode,
+                            duration_seconds=duration,
+                            output_size=run.stdout.size,
+                            output_paths=run.stdout.paths()
+                        )
+                        yield run.index, result
+                    elif now >= run.deadline:
+                        running.remove(run)
+                        duration = now - run.start
+                        run.close(sel)
+                        yield run.index, CheckResult(
+                            name=run.name,
+                            passed=False,
+                            output="",
+                            errors=f"Check timed out after {duration:.1f} seconds",
+                            return_code=-1,
+                            duration_seconds=duration,
+                            output_size=0,
+                            output_paths=[]
+                        )
+        finally:
+            for run in running:
+                run.close(sel)
+            sel.close()
+
+    def _executable(self, program: str) -> str:
+        """Resolve a program name to an absolute path, once per process.
+
+        With a bare name the forked child tries execve() on every PATH
+        entry until one succeeds; resolving up front leaves each spawn a
+        single execve(). On Linux, CPython 3.10+ already spawns with
+        vfork() when no preexec_fn is given, so keep Popen free of
+        preexec_fn and similar hooks.
+
+        Args:
+            program: Program name or path
+
+        Returns:
+            Absolute path, or the name unchanged if it is not on PATH
+        """
+        import shutil
+
+        if program not in self._executables:
+            self._executables[program] = shutil.which(program) or program
+        return self._executables[program]
 
     def run_prowler(self, project_id: str, output_dir: Optional[str] = None) -> CheckResult:
         """Run Prowler against deployed GCP infrastructure.
@@ -283,89 +1005,105 @@ class QARunner:
         Returns:
             Markdown-formatted report string
         """
-        lines = [
-            "# OpenTofu GCP QA Report",
-            "",
-            f"**Target:** `{self.target}`",
-            f"**Generated:** {datetime.now().isoformat()}",
-            ""
-        ]
+        from datetime import datetime
+
+        buf = io.StringIO()
+        w = buf.write
+
+        w("# OpenTofu GCP QA Report\n\n")
+        w(f"**Target:** `{self.target}`\n")
+        w(f"**Generated:** {datetime.now().isoformat()}\n\n")
 
         # Summary
-        passed = sum(1 for r in self.results.values() if r.passed)
+        passed = sum(1 for r in self.results if r.passed)
         total = len(self.results)
         status_emoji = "✅" if passed == total else "❌"
 
-        lines.append(f"## Summary: {status_emoji} {passed}/{total} checks passed")
-        lines.append("")
+        w(f"## Summary: {status_emoji} {passed}/{total} checks passed\n\n")
 
         # Duration
-        if self.start_time and self.end_time:
-            duration = (self.end_time - self.start_time).total_seconds()
-            lines.append(f"**Total Duration:** {duration:.1f} seconds")
-            lines.append("")
+        if self.duration_seconds is not None:
+            w(f"**Total Duration:** {self.duration_seconds:.1f} seconds\n\n")
 
         # Quick status table
-        lines.append("| Check | Status | Duration |")
-        lines.append("|-------|--------|----------|")
-        for name, result in self.results.items():
-            status = "✅ Pass" if result.passed else "❌ Fail"
-            lines.append(f"| {name} | {status} | {result.duration_seconds:.1f}s |")
-        lines.append("")
+        w("| Check | Status | Duration |\n")
+        w("|-------|--------|----------|\n")
+        for result in self.results:
+            if result.name in self.skipped:
+                status = "✅ Skipped"
+            else:
+                status = "✅ Pass" if result.passed else "❌ Fail"
+            w(f"| {result.name} | {status} | {result.duration_seconds:.1f}s |\n")
+        w("\n")
 
         # Detailed results
-        lines.append("## Detailed Results")
-        lines.append("")
+        w("## Detailed Results\n\n")
 
-        for name, result in self.results.items():
+        recommendations = []
+        for result in self.results:
+            name = result.name
             status = "✅" if result.passed else "❌"
-            lines.append(f"### {status} {name}")
-            lines.append("")
+            w(f"### {status} {name}\n\n")
 
             if not result.passed:
+                if name in self.RECOMMENDATIONS:
+                    recommendations.append(f"- **{name}:** {self.RECOMMENDATIONS[name]}\n")
+
                 if result.errors:
-                    lines.append("**Errors:**")
-                    lines.append("```")
-                    lines.append(result.errors.strip())
-                    lines.append("```")
-                    lines.append("")
-
-                if result.output and len(result.output.strip()) < 5000:
-                    lines.append("**Output:**")
-                    lines.append("```")
-                    lines.append(result.output.strip())
-                    lines.append("```")
-                    lines.append("")
-                elif result.output:
-                    lines.append("**Output:** (truncated, see full output in logs)")
-                    lines.append("```")
-                    lines.append(result.output[:2000].strip())
-                    lines.append("...")
-                    lines.append("```")
-                    lines.append("")
+                    w("**Errors:**\n```\n")
+                    w(result.errors.strip())
+                    w("\n```\n\n")
+
+                # Slice the stripped region once instead of copying the whole output
+                output = result.output
+                start, end = _strip_bounds(output)
+                if start < end and end - start < 5000 and not result.output_paths:
+                    w("**Output:**\n```\n")
+                    w(self._format_output(name, output[start:end]))
+                    w("\n```\n\n")
+                elif start < end:
+                    if result.output_paths:
+                        files = ", ".join(f"`{path}`" for path in result.output_paths)
+                        w(f"**Output:** (truncated, {result.output_size} bytes, "
+                          f"see full output in {files})\n```\n")
+                    else:
+                        w("**Output:** (truncated, see full output in logs)\n```\n")
+                    w(output[start:start + 2000].rstrip())
+                    w("\n...\n```\n\n")
+            elif name in self.skipped:
+                w(f"Skipped: {self.skipped[name]}.\n\n")
             else:
-                lines.append("No issues found.")
-                lines.append("")
+                w("No issues found.\n\n")
 
         # Recommendations
         if passed < total:
-            lines.append("## Recommendations")
-            lines.append("")
-            for name, result in self.results.items():
-                if not result.passed:
-                    if name == "Format":
-                        lines.append(f"- **{name}:** Run `tofu fmt -recursive` to fix formatting")
-                    elif name == "Validate":
-                        lines.append(f"- **{name}:** Fix configuration errors before proceeding")
-                    elif name == "TFLint":
-                        lines.append(f"- **{name}:** Review and fix linting issues")
-                    elif name == "Trivy":
-                        lines.append(f"- **{name}:** Address security misconfigurations (AVD-GCP-* checks)")
-                    elif name == "Checkov":
-                        lines.append(f"- **{name}:** Fix policy violations (CKV_GCP_* checks)")
-            lines.append("")
-
-        return "\n".join(lines)
+            w("## Recommendations\n\n")
+            w("".join(recommendations))
+            w("\n")
+
+        # Every section ends with a blank line; drop the last one
+        return buf.getvalue()[:-1]
+
+    def _format_output(self, name: str, output: str) -> str:
+        """Pretty-print a check's JSON output for the report.
+
+        Checks store their raw stdout, so large scanner output is never
+        parsed just to be reindented. Only output small enough to be
+        rendered in full is formatted here.
+
+        Args:
+            name: Check name
+            output: Raw check output
+
+        Returns:
+            Indented JSON, or the output unchanged if it is text or not valid JSON
+        """
+        if not any(n == name and t == "json" for n, _, t, _ in self.CHECKS):
+            return output
+        try:
+            return _json_dumps(_json_loads(output), indent=True)
+        except ValueError:
+            return output  # e.g. several merged documents; keep raw
 
     def generate_json_report(self) -> str:
         """Generate JSON report for CI/CD integration.
@@ -373,31 +1111,287 @@ class QARunner:
         Returns:
             JSON-formatted report string
         """
+        from datetime import datetime
+
+        passed = 0
+        checks = {}
+        for r in self.results:
+            checks[r.name] = {
+                "passed": r.passed,
+                "return_code": r.return_code,
+                "duration_seconds": r.duration_seconds,
+                "errors": r.errors if not r.passed else None,
+                "skipped": self.skipped.get(r.name)
+            }
+            passed += r.passed
+
         report = {
             "target": str(self.target),
             "generated": datetime.now().isoformat(),
             "summary": {
-                "passed": sum(1 for r in self.results.values() if r.passed),
-                "total": len(self.results),
-                "all_passed": all(r.passed for r in self.results.values())
+                "passed": passed,
+                "total": len(checks),
+                "all_passed": passed == len(checks)
             },
-            "checks": {
-                name: {
-                    "passed": r.passed,
-                    "return_code": r.return_code,
-                    "duration_seconds": r.duration_seconds,
-                    "errors": r.errors if not r.passed else None
-                }
-                for name, r in self.results.items()
-            }
+            "checks": checks
         }
-        return json.dumps(report, indent=2)
+        return _json_dumps(report, indent=True)
+
+
+def _orjson():
+    """Get the orjson module if it is installed, importing it at most once.
+
+    Returns:
+        The orjson module, or None to fall back to the stdlib json module
+    """
+    global _ORJSON
+    if _ORJSON is None:
+        try:
+            import orjson
+            _ORJSON = orjson
+        except ImportError:
+            _ORJSON = False
+    return _ORJSON or None
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document with orjson if available, else the json module."""
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.loads(data)
+    import json
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to JSON with orjson if available, else the json module.
+
+    Args:
+        obj: Object to serialize
+        indent: Indent by two spaces instead of emitting compact JSON
+
+    Returns:
+        JSON text
+    """
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    import json
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def _merge_json(outputs: List[str]) -> Optional[str]:
+    """Merge the JSON documents printed by several runs of one scanner.
+
+    Objects that share list-valued keys (TFLint "issues", Trivy "Results")
+    are combined by concatenating those lists; other fields are taken from
+    the first document. Anything else (Checkov reports) becomes a list of
+    reports, which is the shape Checkov itself uses for several frameworks.
+
+    Args:
+        outputs: Raw JSON output of each run
+
+    Returns:
+        Merged JSON document, or None if any output is not valid JSON
+    """
+    try:
+        docs = [_json_loads(output) for output in outputs]
+    except ValueError:
+        return None
+    if not docs:
+        return ""
+
+    list_keys = [k for k, v in docs[0].items() if isinstance(v, list)] if isinstance(docs[0], dict) else []
+    if list_keys and all(isinstance(doc, dict) for doc in docs):
+        merged = dict(docs[0])
+        for key in list_keys:
+            merged[key] = list(chain.from_iterable(doc.get(key) or [] for doc in docs))
+        return _json_dumps(merged)
+
+    return _json_dumps(list(chain.from_iterable(doc if isinstance(doc, list) else [doc] for doc in docs)))
+
+
+def _make_cache_dir(path: Path) -> None:
+    """Create the cache directory, keeping it out of the project's git status.
+
+    Args:
+        path: Cache directory
+
+    Raises:
+        OSError: If the directory cannot be created
+    """
+    path.mkdir(exist_ok=True)
+    gitignore = path / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n")
+
+
+def _cpu_count() -> int:
+    """Count the CPUs this process may run on.
+
+    os.cpu_count() reports every CPU on the host, including those that
+    affinity (taskset, container cpusets) excludes.
+
+    Returns:
+        Number of usable CPUs, at least 1
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on Windows or macOS
+        return os.cpu_count() or 1
+
+
+def _strip_bounds(text: str) -> Tuple[int, int]:
+    """Find the slice text.strip() would return, without copying text.
+
+    Args:
+        text: String to scan
+
+    Returns:
+        (start, end) such that text[start:end] == text.strip()
+    """
+    start, end = 0, len(text)
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _drain_pipe(pipe: BinaryIO, sink: "_OutputSink") -> None:
+    """Copy a pipe into a sink until EOF; the reader thread body without SELECT_PIPES."""
+    for chunk in iter(lambda: os.read(pipe.fileno(), COPY_CHUNK_SIZE), b""):
+        sink.write(chunk)
+
+
+class _OutputSink:
+    """Collects a process's output, moving it to a file once it grows large.
+
+    Until limit bytes have been written everything stays in memory. Past
+    that, the data so far and everything after it goes to path, and only
+    the first preview_size bytes are kept. Without a path all output is
+    kept in memory.
+    """
+    __slots__ = ("path", "limit", "preview_size", "buffer", "file", "size")
+
+    def __init__(self, path: Optional[Path] = None, limit: int = 0, preview_size: int = 0):
+        self.path = path
+        self.limit = limit
+        self.preview_size = preview_size
+        self.buffer = bytearray()
+        self.file: Optional[BinaryIO] = None
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        """Append a chunk of output."""
+        self.size += len(data)
+        if self.file is not None:
+            self.file.write(data)
+            return
+        self.buffer += data
+        if self.path is not None and len(self.buffer) > self.limit:
+            try:
+                _make_cache_dir(self.path.parent)
+                self.file = open(self.path, "wb")
+            except OSError:
+                self.path = None  # Keep everything in memory instead
+                return
+            self.file.write(self.buffer)
+            del self.buffer[self.preview_size:]
+
+    def text(self) -> str:
+        """Decode the output held in memory (the preview, if moved to a file)."""
+        return self.buffer.decode("utf-8", errors="replace")
+
+    def paths(self) -> List[str]:
+        """Get the file holding the full output, if it was moved to one."""
+        return [str(self.path)] if self.file is not None else []
+
+    def close(self) -> None:
+        """Close the output file, if any."""
+        if self.file is not None:
+            self.file.close()
+
+
+class _Running:
+    """Bookkeeping for a process started by QARunner._run_many."""
+    __slots__ = (
+        "index", "name", "cmd", "proc", "start", "deadline", "stdout", "stderr", "open_pipes", "readers"
+    )
+
+    def __init__(
+        self,
+        index: int,
+        name: str,
+        cmd: List[str],
+        proc: subprocess.Popen,
+        start: float,
+        deadline: float,
+        stdout: _OutputSink,
+        stderr: _OutputSink
+    ):
+        self.index = index
+        self.name = name
+        self.cmd = cmd
+        self.proc = proc
+        self.start = start
+        self.deadline = deadline
+        self.stdout = stdout
+        self.stderr = stderr
+        self.open_pipes = 0
+        self.readers: List[Any] = []  # Reader threads, when not SELECT_PIPES
+
+    def close(self, sel) -> None:
+        """Kill the process if still running and release its pipes and sinks."""
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        for reader in self.readers:
+            reader.join(timeout=1)  # Children of a killed process may hold the pipe
+        for pipe in (self.proc.stdout, self.proc.stderr):
+            if pipe is not None and not pipe.closed:
+                if not self.readers:
+                    sel.unregister(pipe)
+                pipe.close()
+        self.stdout.close()
+        self.stderr.close()
+
+
+def get_changed_files(target: Path, base_ref: str) -> Optional[List[Path]]:
+    """List files changed between a git base ref and HEAD.
+
+    Args:
+        target: Directory inside the git repository
+        base_ref: Git ref to diff against (e.g. origin/main)
+
+    Returns:
+        List of absolute paths, or None if the diff could not be computed
+    """
+    try:
+        toplevel = subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=target,
+            timeout=30
+        ).stdout.strip()
+        diff = subprocess.run(
+            ["git", "diff", "--name-only", f"{base_ref}...HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=target,
+            timeout=30
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired) as e:
+        print(f"Warning: could not diff against {base_ref}, scanning everything: {e}")
+        return None
+    return [Path(toplevel) / line for line in diff.stdout.splitlines() if line]
 
 
 def main():
     """Main entry point for QA runner."""
-    # Parse arguments
-    target = sys.argv[1] if len(sys.argv) > 1 else "."
     output_format = "markdown"  # Default to markdown
 
     # Check for format flag
@@ -405,8 +1399,29 @@ def main():
         output_format = "json"
         sys.argv.remove("--json")
 
+    # Check for incremental mode; pull request workflows set GITHUB_BASE_REF
+    base_ref = None
+    if "--since" in sys.argv:
+        i = sys.argv.index("--since")
+        if i + 1 >= len(sys.argv):
+            print("Error: --since requires a git ref")
+            sys.exit(1)
+        base_ref = sys.argv[i + 1]
+        del sys.argv[i:i + 2]
+    elif os.environ.get("GITHUB_BASE_REF"):
+        base_ref = f"origin/{os.environ['GITHUB_BASE_REF']}"
+
+    # Check for cache flag
+    use_cache = "--no-cache" not in sys.argv
+    if not use_cache:
+        sys.argv.remove("--no-cache")
+
+    # Parse arguments
+    target = sys.argv[1] if len(sys.argv) > 1 else "."
+
     # Initialize runner
-    runner = QARunner(target)
+    changed_files = get_changed_files(Path(target), base_ref) if base_ref else None
+    runner = QARunner(target, changed_files, use_cache=use_cache)
 
     # Check prerequisites
     missing = runner.get_missing_tools()
@@ -422,6 +1437,8 @@ def main():
     # Run checks
     print(f"\nOpenTofu GCP QA Runner")
     print(f"Target: {runner.target}")
+    if runner.changed_files is not None:
+        print(f"Changed since {base_ref}: {len(runner.changed_files)} .tf file(s)")
     print("-" * 40)
 
     runner.run_all()
@@ -435,7 +1452,7 @@ def main():
         print(runner.generate_report())
 
     # Exit with appropriate code
-    all_passed = all(r.passed for r in runner.results.values())
+    all_passed = all(r.passed for r in runner.results)
     sys.exit(0 if all_passed else 1)
 
 
@@ -0,0 +1,371 @@
+"""Tests for scripts/qa_runner.py against stub tofu/tflint/trivy/checkov binaries."""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import qa_runner  # noqa: E402
+from qa_runner import QARunner, _merge_json, _strip_bounds  # noqa: E402
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="stub tools are POSIX scripts")
+
+# One stub serves every tool, dispatching on the name it was invoked as.
+# STUB_LOG records each scan, STUB_FAIL lists tools (tofu as tofu-<subcommand>)
+# that should fail, STUB_SLEEP delays each scan and STUB_BIG pads Checkov output.
+STUB = '''\
+import json
+import os
+import sys
+import time
+
+tool = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+if args == ["--version"]:
+    print(f"{tool} 1.0.0")
+    sys.exit(0)
+with open(os.environ["STUB_LOG"], "a") as log:
+    log.write(" ".join([tool, *args]) + "\\n")
+time.sleep(float(os.environ.get("STUB_SLEEP", "0")))
+
+name = f"{tool}-{args[0]}" if tool == "tofu" else tool
+fail = name in os.environ.get("STUB_FAIL", "").split(",")
+if name == "tofu-fmt" and fail:
+    print("main.tf")
+elif name == "tofu-validate":
+    print("Success! The configuration is valid.")
+elif tool == "tflint":
+    chdir = next((a.split("=", 1)[1] for a in args if a.startswith("--chdir=")), ".")
+    print(json.dumps({"issues": [{"rule": {"name": "stub"}, "dir": chdir}], "errors": []}))
+elif tool == "trivy":
+    print(json.dumps({"SchemaVersion": 2, "Results": [{"Target": args[1]}]}))
+elif tool == "checkov":
+    target = args[args.index("-d") + 1] if "-d" in args else "files"
+    padding = "x" * int(os.environ.get("STUB_BIG", "0"))
+    print(json.dumps({"check_type": "terraform", "summary": {"target": target}, "padding": padding}))
+sys.exit(1 if fail else 0)
+'''
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Single-module project with the stub tools first on PATH."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for tool in QARunner.REQUIRED_TOOLS:
+        stub = bin_dir / tool
+        stub.write_text(f"#!{sys.executable}\n{STUB}")
+        stub.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("STUB_LOG", str(tmp_path / "calls.log"))
+    # Versions and executables are memoized per process
+    monkeypatch.setattr(QARunner, "_tool_versions", {})
+    monkeypatch.setattr(QARunner, "_executables", {})
+
+    target = tmp_path / "project"
+    target.mkdir()
+    (target / "main.tf").write_text('resource "google_storage_bucket" "b" {}\n')
+    (target / ".terraform").mkdir()  # Skip tofu init
+    return target
+
+
+def calls(project, tool):
+    """Invocations of a stub tool logged so far, as argument strings."""
+    log = project.parent / "calls.log"
+    if not log.exists():
+        return []
+    return [line for line in log.read_text().splitlines() if line.split(" ", 1)[0] == tool]
+
+
+def reset_log(project):
+    (project.parent / "calls.log").unlink()
+
+
+def test_run_all_passes(project):
+    runner = QARunner(str(project))
+    results = runner.run_all()
+
+    assert [r.name for r in results] == [name for name, _, _, _ in QARunner.CHECKS]
+    assert all(r.passed for r in results)
+    assert json.loads(runner.generate_json_report())["summary"]["all_passed"]
+
+
+def test_cache_hit_skips_scanners_but_not_validate(project):
+    QARunner(str(project)).run_all()
+    reset_log(project)
+
+    results = QARunner(str(project)).run_all()
+
+    assert all(r.passed for r in results)
+    assert calls(project, "tofu") == ["tofu validate"]
+    assert calls(project, "tflint") == calls(project, "trivy") == calls(project, "checkov") == []
+
+
+@pytest.mark.parametrize("config", [
+    ".tflint.hcl",
+    ".trivyignore",
+    ".checkov.yaml",
+    "terraform.tfvars",
+    "main.tf.json",
+    ".terraform.lock.hcl",
+    ".terraform/modules/modules.json",
+    "tests/main.tftest.hcl",
+    "main.tofutest.hcl",
+])
+def test_cache_miss_when_config_changes(project, config):
+    QARunner(str(project)).run_all()
+    reset_log(project)
+
+    path = project / config
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("# changed\n")
+    QARunner(str(project)).run_all()
+
+    assert len(calls(project, "tflint")) == 1
+    assert len(calls(project, "checkov")) == 1
+
+
+@pytest.mark.parametrize("module", ["net", "base"])
+def test_cache_miss_when_outside_local_module_changes(project, module):
+    modules = project.parent / "modules"
+    for name, body in (("net", 'module "base" {\n  source = "../base"\n}\n'), ("base", "")):
+        (modules / name).mkdir(parents=True)
+        (modules / name / "main.tf").write_text(body)
+    (project / "main.tf").write_text('module "net" {\n  source = "../modules/net"\n}\n')
+    QARunner(str(project)).run_all()
+    reset_log(project)
+
+    QARunner(str(project)).run_all()
+    assert calls(project, "checkov") == []
+
+    (modules / module / "variables.tf").write_text('variable "x" {}\n')
+    QARunner(str(project)).run_all()
+    assert len(calls(project, "checkov")) == 1
+
+
+def test_failures_are_not_cached(project, monkeypatch):
+    monkeypatch.setenv("STUB_FAIL", "tflint")
+    QARunner(str(project)).run_all()
+    reset_log(project)
+
+    runner = QARunner(str(project))
+    runner.run_all()
+
+    assert not runner.get_result("TFLint").passed
+    assert len(calls(project, "tflint")) == 1
+    assert calls(project, "trivy") == []
+
+
+def test_no_cache_reruns_everything(project):
+    QARunner(str(project)).run_all()
+    reset_log(project)
+
+    QARunner(str(project), use_cache=False).run_all()
+
+    assert len(calls(project, "checkov")) == 1
+
+
+def test_cache_dir_is_git_ignored_and_pruned(project):
+    QARunner(str(project)).run_all()
+    cache_dir = project / QARunner.CACHE_DIR
+    assert (cache_dir / ".gitignore").read_text() == "*\n"
+
+    stale = cache_dir / "Checkov-stale.json"
+    stale.write_text("{}")
+    (project / "main.tf").write_text('resource "google_storage_bucket" "c" {}\n')
+    QARunner(str(project)).run_all()
+
+    entries = {path.name for path in cache_dir.iterdir()}
+    assert "Checkov-stale.json" not in entries
+    assert ".gitignore" in entries
+    # One entry per cached check, none left over from the first run
+    assert len([name for name in entries if name.endswith(".json")]) == 4
+
+
+@pytest.mark.parametrize("select_pipes", [True, False])
+def test_quiet_check_reruns_to_capture_output(project, monkeypatch, select_pipes):
+    monkeypatch.setattr(qa_runner, "SELECT_PIPES", select_pipes)
+    monkeypatch.setenv("STUB_FAIL", "tofu-fmt")
+    runner = QARunner(str(project), use_cache=False)
+    runner.run_all()
+
+    fmt = runner.get_result("Format")
+    assert not fmt.passed
+    assert fmt.output.strip() == "main.tf"
+    assert len([c for c in calls(project, "tofu") if c.startswith("tofu fmt")]) == 2
+    # Passing quiet checks run once and keep no output
+    assert len([c for c in calls(project, "tofu") if c.startswith("tofu validate")]) == 1
+    assert runner.get_result("Validate").output == ""
+
+
+@pytest.mark.parametrize("select_pipes", [True, False])
+def test_timeout_kills_process(project, monkeypatch, select_pipes):
+    monkeypatch.setattr(qa_runner, "SELECT_PIPES", select_pipes)
+    monkeypatch.setenv("STUB_SLEEP", "30")
+    runner = QARunner(str(project))
+
+    [(index, result)] = list(runner._run_many([("Checkov", ["checkov", "-d", "."])], timeout=0.5))
+
+    assert index == 0
+    assert not result.passed
+    assert result.return_code == -1
+    assert "timed out" in result.errors
+    assert result.duration_seconds < 10
+
+
+def test_sharded_scans_are_merged(project):
+    for module in ("mod_a", "mod_b"):
+        (project / module).mkdir()
+        (project / module / "main.tf").write_text('variable "x" {}\n')
+    runner = QARunner(str(project))
+    runner.run_all()
+
+    root, *shards = sorted(calls(project, "checkov"))
+    assert root.startswith("checkov -d . --framework terraform -o json --compact --skip-path ")
+    assert root.count("--skip-path") == 2
+    assert shards == [
+        "checkov -d mod_a --framework terraform -o json --compact",
+        "checkov -d mod_b --framework terraform -o json --compact",
+    ]
+    assert len(calls(project, "trivy")) == 3
+    assert len(calls(project, "tflint")) == 1
+
+    checkov = json.loads(runner.get_result("Checkov").output)
+    assert [report["summary"]["target"] for report in checkov] == [".", "mod_a", "mod_b"]
+    trivy = json.loads(runner.get_result("Trivy").output)
+    assert [r["Target"] for r in trivy["Results"]] == [".", "mod_a", "mod_b"]
+    assert trivy["SchemaVersion"] == 2
+
+
+def test_spilled_output_is_previewed(project, monkeypatch):
+    monkeypatch.setattr(QARunner, "OUTPUT_MEMORY_LIMIT", 1000)
+    monkeypatch.setattr(QARunner, "OUTPUT_PREVIEW_SIZE", 100)
+    monkeypatch.setenv("STUB_BIG", "5000")
+    monkeypatch.setenv("STUB_FAIL", "checkov")
+    runner = QARunner(str(project))
+    runner.run_all()
+
+    checkov = runner.get_result("Checkov")
+    [path] = checkov.output_paths
+    full = Path(path).read_text()
+    assert checkov.output_size == len(full) > 5000
+    assert len(checkov.output) == 100
+    assert full.startswith(checkov.output)
+
+    report = runner.generate_report()
+    assert f"(truncated, {checkov.output_size} bytes, see full output in `{path}`)" in report
+    assert checkov.output in report
+
+
+def test_since_without_changed_tf_files_reports_skipped(project):
+    runner = QARunner(str(project), changed_files=[])
+    results = runner.run_all()
+
+    assert [r.name for r in results] == [name for name, _, _, _ in QARunner.CHECKS]
+    assert calls(project, "tflint") == calls(project, "trivy") == calls(project, "checkov") == []
+    checks = json.loads(runner.generate_json_report())["checks"]
+    assert checks["Trivy"]["passed"]
+    assert checks["Trivy"]["skipped"] == "no changed .tf files"
+    assert checks["Format"]["skipped"] is None
+
+
+@pytest.mark.parametrize("changed, scanned", [
+    (["main.tf", "mod_a/main.tf"], ["."]),
+    (["mod_a/main.tf", "mod_a/sub/main.tf", "mod_b/main.tf"], ["mod_a", "mod_b"]),
+])
+def test_since_scans_nested_directories_once_with_trivy(project, changed, scanned):
+    for path in ("mod_a/main.tf", "mod_a/sub/main.tf", "mod_b/main.tf"):
+        (project / path).parent.mkdir(parents=True, exist_ok=True)
+        (project / path).write_text('variable "x" {}\n')
+    runner = QARunner(str(project), changed_files=[Path(path) for path in changed])
+    runner.run_all()
+
+    assert sorted(c.split()[2] for c in calls(project, "trivy")) == scanned
+    targets = [r["Target"] for r in json.loads(runner.get_result("Trivy").output)["Results"]]
+    assert sorted(targets) == scanned
+    # TFLint does not recurse, so it still covers every changed directory
+    assert len(calls(project, "tflint")) == len({str(Path(path).parent) for path in changed})
+
+
+def test_checkov_root_shard_skips_only_shard_directories(project):
+    # The target's own path contains "project", and network.tf contains "network"
+    for module in ("network", "project"):
+        (project / module).mkdir()
+        (project / module / "main.tf").write_text('variable "x" {}\n')
+    (project / "network.tf").write_text('variable "y" {}\n')
+    runner = QARunner(str(project))
+
+    [root] = [cmd for name, cmd, _, _ in runner._build_checks() if name == "Checkov" and "--skip-path" in cmd]
+    skip_paths = [root[i + 1] for i, arg in enumerate(root) if arg == "--skip-path"]
+
+    def skipped(path):
+        # Checkov 3.x filter_ignored_paths on the absolute path
+        full_path = str(project / path)
+        return any(re.search(p, full_path) or p in full_path for p in skip_paths)
+
+    assert not skipped("main.tf")
+    assert not skipped("network.tf")
+    assert skipped("network")
+    assert skipped("project/main.tf")
+
+
+def test_trivy_root_shard_runs_without_root_tf_files(project):
+    (project / "main.tf").unlink()
+    for module in ("envs", "modules"):
+        (project / module).mkdir()
+        (project / module / "main.tf").write_text('variable "x" {}\n')
+    QARunner(str(project)).run_all()
+
+    # Trivy also scans non-Terraform files outside the module directories
+    assert sorted(calls(project, "trivy"))[0] == (
+        "trivy config . --severity CRITICAL,HIGH,MEDIUM --format json --skip-dirs envs --skip-dirs modules"
+    )
+    assert len(calls(project, "trivy")) == 3
+    assert sorted(c.split()[2] for c in calls(project, "checkov")) == ["envs", "modules"]
+
+
+def test_parallel_checks_are_capped(project, monkeypatch):
+    monkeypatch.setattr(qa_runner, "_cpu_count", lambda: 64)
+    seen = []
+    run_many = QARunner._run_many
+
+    def spy(self, commands, max_parallel=None, **kwargs):
+        seen.append(max_parallel)
+        return run_many(self, commands, max_parallel, **kwargs)
+
+    monkeypatch.setattr(QARunner, "_run_many", spy)
+    QARunner(str(project)).run_all()
+
+    assert seen == [QARunner.MAX_PARALLEL]
+
+
+def test_merge_json_concatenates_list_keys():
+    merged = _merge_json([
+        '{"issues": [{"rule": "a"}], "errors": []}',
+        '{"issues": [{"rule": "b"}], "errors": [{"message": "e"}]}',
+    ])
+    assert json.loads(merged) == {
+        "issues": [{"rule": "a"}, {"rule": "b"}],
+        "errors": [{"message": "e"}],
+    }
+
+
+def test_merge_json_lists_reports_without_list_keys():
+    merged = _merge_json(['{"check_type": "terraform"}', '[{"check_type": "a"}, {"check_type": "b"}]'])
+    assert json.loads(merged) == [{"check_type": "terraform"}, {"check_type": "a"}, {"check_type": "b"}]
+
+
+def test_merge_json_rejects_invalid_json():
+    assert _merge_json(['{"issues": []}', "not json"]) is None
+    assert _merge_json([]) == ""
+
+
+@pytest.mark.parametrize("text", ["", "   ", "abc", "  abc\n", "\n\ta b\t\n", "a\n\n"])
+def test_strip_bounds_matches_strip(text):
+    start, end = _strip_bounds(text)
+    assert text[start:end] == text.strip()